@@ -1,3 +1,5 @@
 # flake8: noqa
 from .am232x import AM232x
-from .constants import __version__
\ No newline at end of file
+from .constants import __version__
+
+__all__ = ["AM232x", "__version__"]
@@ -1,8 +1,5 @@
 # -*- coding: utf-8 -*-
-from __future__ import print_function
 from argparse import ArgumentParser
-import sys
-import json
 from logging import basicConfig, getLogger, DEBUG, INFO
 from . import AM232x
 from . import __version__
@@ -42,6 +39,8 @@ def default(am232x, args):
 
 
 def to_json(am232x, args):
+    # json サブコマンドでしか利用しないため、起動時間を抑えるようここで import する。
+    import json
     mesg = json.dumps({"temperature": am232x.temperature,
                        "humidity": am232x.humidity,
                        "discomfort": am232x.discomfort})
@@ -112,6 +111,7 @@ def main():
         logger.info("Set loglevel to debug.")
         logger.setLevel(DEBUG)
     if args.version:
+        import sys
         print("am232x(pyam232x) {pyam232x_version}\n\nPython {python_version}"
               .format(pyam232x_version=__version__, python_version=sys.version))
         exit(0)
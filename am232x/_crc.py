@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+""" AM2321/AM2322 が利用する Modbus CRC-16 (多項式 0xA001) の計算を行うモジュールです。
+
+crcmod パッケージがインストールされている場合は、その C 実装を利用して CRC を計算します。
+crcmod が無い環境でも動作するよう、純 Python のテーブル参照実装にフォールバックします。
+crcmod は ``pip install pyam232x[speed]`` でインストールできます。
+"""
+from array import array
+
+
+def _crc16_step(crc, b):
+    """ Modbus CRC-16 を 1 バイト分進める、ループもテーブルも使わない閉形式の実装です。
+
+    8 ビット分のシフト・XOR を多項式計算として展開したものです。
+    各ステップの最下位ビット (商ビット) は入力バイトの下位からの累積 XOR (prefix XOR) になり、
+    それを q とすると 8 ステップ分の多項式 0xA001 の寄与は (q << 8) ^ (q << 6) ^ (q >> 7) にまとまります。
+    テーブルを持ちたくない場合のフォールバックとしても、テーブルの生成にも利用できます。
+
+    Args:
+        crc(int): 現在の CRC (16 ビットの整数)。
+        b(int): 処理するデータ (1 バイト)。
+
+    Returns:
+        int: 1 バイト分進めた CRC (16 ビットの整数)。
+    """
+    q = (crc ^ b) & 0xff
+    # 下位ビットからの prefix XOR を倍々のシフトで計算する。
+    q ^= q << 1
+    q ^= q << 2
+    q ^= q << 4
+    q &= 0xff
+    return (crc >> 8) ^ (q << 8) ^ (q << 6) ^ (q >> 7)
+
+
+def _gen_crc16_table():
+    """ Modbus CRC-16 (多項式 0xA001) の 256 エントリのテーブルを生成する関数です。
+
+    1 バイト分 (8 ビット) のシフト・XOR をあらかじめ計算しておくことで、
+    crc16_modbus() がバイト単位のテーブル参照のみで CRC を計算できるようにします。
+    """
+    for i in range(256):
+        yield _crc16_step(0, i)
+
+
+# モジュールの import 時に一度だけ生成する CRC-16 のテーブル。
+# array('H') は uint16 の配列で、 tuple よりメモリが小さくインデックス参照も速い。
+_CRC16_TABLE = array('H', _gen_crc16_table())
+
+
+def _gen_crc16_slice_tables():
+    """ slice-by-4 用の 4 本のテーブル T0..T3 を生成する関数です。
+
+    Tk[b] は「バイト b の後に k バイトのゼロが続くデータ」の CRC を表し、
+    4 バイトをテーブル参照 4 回 (バイト毎のループなし) で処理できるようにします。
+    """
+    t0 = _CRC16_TABLE
+    tables = [t0]
+    for _ in range(3):
+        prev = tables[-1]
+        tables.append(array('H', ((e >> 8) ^ t0[e & 0xff] for e in prev)))
+    return tables
+
+
+_T0, _T1, _T2, _T3 = _gen_crc16_slice_tables()
+
+
+def _crc16_modbus_py(data):
+    """ Modbus CRC-16 を計算する純 Python 実装です。
+
+    4 バイト毎に slice-by-4 のテーブル参照でまとめて処理し、
+    残りのバイトは 1 バイト毎のテーブル参照で処理します。
+
+    Args:
+        data(bytes): CRC を計算する対象のデータ。
+
+    Returns:
+        int: 計算した CRC (16 ビットの整数)。
+    """
+    crc = 0xffff
+    n = len(data)
+    i = 0
+    while n - i >= 4:
+        crc = (_T3[(crc ^ data[i]) & 0xff] ^ _T2[((crc >> 8) ^ data[i + 1]) & 0xff]
+               ^ _T1[data[i + 2]] ^ _T0[data[i + 3]])
+        i += 4
+    while i < n:
+        crc = (crc >> 8) ^ _T0[(crc ^ data[i]) & 0xff]
+        i += 1
+    return crc
+
+
+try:
+    # crcmod の "modbus" は多項式 0xA001 (反転)・初期値 0xFFFF で、
+    # _crc16_modbus_py と同一の CRC を計算する。
+    from crcmod.predefined import mkPredefinedCrcFun
+    crc16_modbus = mkPredefinedCrcFun("modbus")
+except ImportError:
+    crc16_modbus = _crc16_modbus_py
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+import time
+import asyncio
+from logging import getLogger
+from .am232x import AM232x
+from .exceptions import AM232xError, ReceiveAM232xDataError
+
+
+logger = getLogger(__name__)
+
+
+class AsyncAM232x(AM232x):
+    """ AM2321/AM2322 を asyncio のイベントループから利用するためのクラスです。
+
+    AM232x の待機 (time.sleep) はスレッド全体をブロックしてしまうため、
+    イベントループ上で複数のセンサーや他のタスクと共存できません。
+    このクラスは待機を asyncio.sleep に、ブロックする I2C 通信を
+    イベントループの executor に置き換えた async 版のメソッドを提供します。
+
+    Examples:
+
+        >>> import asyncio
+        >>> from am232x.aio import AsyncAM232x
+        >>>
+        >>> async def main():
+        ...     am232x = AsyncAM232x(name="am2322")
+        ...     await am232x.read()
+        ...     print(am232x.temperature)
+        >>>
+        >>> asyncio.run(main())
+
+    Note:
+        humidity / temperature / discomfort のプロパティは計算済みのデータを参照するだけです。
+        データが未取得の場合、プロパティから read() を await することはできないため、
+        AM232xError が送出されます。プロパティを参照する前に、必ず await read() を実行してください。
+    """
+
+    def __init__(self, name="am232x", bus=1, retry_wait=20000, retry_num=10):
+        # wakeup は await が必要なため、コンストラクタでは実行しない。
+        # (measure() が必要なタイミングで wakeup() を await する。)
+        super(AsyncAM232x, self).__init__(name=name, bus=bus, wakeup=False,
+                                          retry_wait=retry_wait, retry_num=retry_num)
+
+    async def _func_i2c_retry(self, func, args, retry_wait=None, retry_num=None):
+        """ AM2321/AM2322 との I2C 通信を制御するメソッドです。
+
+        AM232x._func_i2c_retry() の async 版です。ブロックする I2C 通信を
+        イベントループの executor で実行し、リトライ時の待機には asyncio.sleep を利用します。
+
+        Args:
+            func(func): I2C 通信を行う関数。
+            args(tuple): func に渡す引数一式。
+            retry_wait(int): リトライ時の待機時間の上限。マイクロ秒で指定する。指定がない場合は、インスタンス初期化時の retry_wait が利用される。
+            retry_num(int): 最大リトライ回数。指定がない場合は、インスタンス初期化時の retry_cnt が利用される。
+
+        Raises:
+            IOError: 最大リトライ回数に達してなお IOError が raise される場合に、最後に送出された IOError をそのまま呼び出し元に送出する。
+        """
+        chip_addr = self.chip_addr
+        if retry_wait is None:
+            retry_wait = self._retry_wait
+        if retry_num is None:
+            retry_num = self._retry_num
+        loop = asyncio.get_running_loop()
+        cnt = 0
+        while True:
+            try:
+                return await loop.run_in_executor(None, func, chip_addr, *args)
+            except IOError as e:
+                if cnt < retry_num:
+                    # 指数バックオフ。 50 マイクロ秒から倍々で伸ばし、 retry_wait を上限とする。
+                    await asyncio.sleep(min(retry_wait, 50 << cnt) / 1000000.0)
+                    cnt += 1
+                    logger.debug(("{name} : Execute the \"{func}\" was failed. "
+                                  "retry count: {cnt}/{limit}: Exception: {exception}"
+                                  .format(name=self._name, func=func.__name__, cnt=cnt, limit=retry_num, exception=e)))
+                else:
+                    raise e
+
+    async def _write_byte_data(self, register, data):
+        """ AM2321/AM2322 に1バイト書き込みを行うメソッドです。 AM232x._write_byte_data() の async 版です。
+
+        Args:
+            register(int): 書き込みを行うアドレス。
+            data(int): 書き込みを行うデータ(1バイト)。
+        """
+        i2c = self._i2c
+        args = (register, data)
+        await self._func_i2c_retry(func=i2c.write_byte_data, args=args)
+
+    async def _write_i2c_block_data(self, register, data_list):
+        """ AM2321/AM2322 に複数バイト書き込みを行うメソッドです。 AM232x._write_i2c_block_data() の async 版です。
+
+        Args:
+            register(int): 書き込みを行うアドレス。
+            data_list(list): 書き込みを行うデータ(1バイト)のリスト。
+        """
+        i2c = self._i2c
+        args = (register, data_list)
+        await self._func_i2c_retry(func=i2c.write_i2c_block_data, args=args)
+
+    async def _read_data(self, length):
+        """ AM2321/AM2322 からデータを読み出すメソッドです。 AM232x._read_data() の async 版です。
+
+        Args:
+            length(int): 読み込むデータの長さ(バイト数)。
+
+        Returns:
+            bytes: 読み込んだデータ。
+        """
+        return await self._func_i2c_retry(func=self._i2c_read, args=(length,), retry_wait=200000)
+
+    async def _send_wakeup(self):
+        """ AM2321/AM2322 を動作させるシグナルを送出する(待機は行わない)メソッドです。 AM232x._send_wakeup() の async 版です。"""
+        i2c = self._i2c
+        chip_addr = self.chip_addr
+        loop = asyncio.get_running_loop()
+
+        try:
+            await loop.run_in_executor(None, i2c.write_byte_data, chip_addr, 0x00, 0x00)
+        except Exception:
+            pass  # wakeup は必ず通信が失敗する。これは AM2321/2322 の仕様。
+        self._wakeup = True
+
+    async def wakeup(self):
+        """ スリープ状態にある AM2321/AM2322 を動作させるシグナルを送出するメソッドです。 AM232x.wakeup() の async 版です。"""
+        if self._wakeup:
+            return
+        await self._send_wakeup()
+        await asyncio.sleep(self._sleep_wakeup)
+
+    async def set_write_mode(self):
+        """ AM2321/AM2322 を書き込みモードにするメソッドです。 AM232x.set_write_mode() の async 版です。"""
+        await self._write_byte_data(0x00, 0x00)
+        self._write_mode = True
+        await asyncio.sleep(self._sleep_writemode)
+
+    async def measure(self):
+        """ AM2321/AM2322 に、データを計測する命令を送信するメソッドです。 AM232x.measure() の async 版です。"""
+        if not self._wakeup:
+            # wakeup で書き込む 0x00 は set_write_mode() の書き込みと同一で、
+            # 書き込みモードのアドレスポインタもこの時点で設定される。
+            # このため 2 回目の書き込みを省略し、 2 つの待機を長い方の 1 回にまとめる。
+            await self._send_wakeup()
+            self._write_mode = True
+            await asyncio.sleep(self._sleep_measure)
+        elif not self._write_mode:
+            await self.set_write_mode()
+        await self._write_i2c_block_data(0x03, [0x00, 0x04])
+        self._measured = True
+        await asyncio.sleep(self._sleep_readmode)
+        # "_raw_data" を破棄し、次の read() で再度データが読み出されるようにする。
+        self._raw_data = None
+        self._raw_bytes = None
+        self._del_properties()
+
+    async def read(self, check_err=True, check_crc=True, retry_num=10, retry_wait=2000000):
+        """ AM2321/AM2322 から計測したデータを読み出すメソッドです。 AM232x.read() の async 版です。
+
+        Args:
+            check_err(bool): check_err() メソッドを呼び出すか否か。デフォルトは True.
+            check_crc(bool): check_crc() メソッドを呼び出すか否か。デフォルトは True.
+            retry_num(int): 読み出し時に AM232xError を基底クラスにする例外が送出された場合に、最大でリトライする回数。
+            retry_wait(int): 読み出し時に AM232xError を基底クラスにする例外が送出された場合に、リトライするまでの待機時間(マイクロ秒)。
+
+        Raises:
+            ReceiveAM232xDataError: 受信したデータにエラーコードが含まれていた場合に送出される Exception.
+            AM232xCrcCheckError: 受信した CRC と、受信したデータを計算して得られた CRC に相違があった場合に送出される Exception.
+        """
+        cnt = 0
+        while True:
+            if not self._measured:
+                await self.measure()
+            if self._raw_data is None:
+                self._raw_data = await self._read_data(8)
+                self._raw_bytes = self._raw_data
+                self._del_properties()
+                self._wakeup = False
+                self._write_mode = False
+                # 鮮度の判定 (wait_refresh との比較) 用なので、 NTP で巻き戻り得る
+                # time.time() ではなく単調増加の time.monotonic_ns() を記録する。
+                self._read_time = time.monotonic_ns()
+                try:
+                    self._validate(check_err=check_err, check_crc=check_crc)
+                except AM232xError as e:
+                    if cnt < retry_num:
+                        if isinstance(e, ReceiveAM232xDataError):
+                            # 計測データが不正であるため、再計測させる。
+                            self._measured = False
+                        cnt += 1
+                        logger.debug(("{name} : AM232x error was occurred. retry count: {cnt}/{limit}, Exception: {exception}"
+                                      .format(name=self._name, cnt=cnt, limit=retry_num, exception=e)))
+                        await asyncio.sleep(retry_wait / 1000000.0)
+                        continue
+                    else:
+                        raise e
+
+            return self._raw_data
+
+    def _calc(self, offset):
+        """ AM2321/AM2322 から受信したデータを計算し、必要な情報を取得する為のメソッドです。
+
+        AM232x._calc() と異なり、同期のプロパティからは read() を await できないため、
+        データが未取得の場合は read() を呼び出す代わりに AM232xError を送出します。
+
+        Args:
+            offset(int): 上位バイトとして利用するデータのインデックス番号。この位置からビッグエンディアンの 2 バイトを読み取る。
+
+        Returns:
+            float: 計算結果を戻します。
+
+        Raises:
+            AM232xError: データが未取得の場合に送出される Exception. あらかじめ await read() を実行してください。
+        """
+        if self._raw_data is None:
+            raise AM232xError("{name} : No data has been read yet. "
+                              "Execute \"await read()\" before accessing the properties."
+                              .format(name=self._name))
+        return super(AsyncAM232x, self)._calc(offset)
@@ -1,12 +1,22 @@
 # -*- coding: utf-8 -*-
 import time
-import smbus
+import struct
+from smbus2 import SMBus, i2c_msg
 from logging import getLogger
 from .exceptions import AM232xError, ReceiveAM232xDataError, AM232xCrcCheckError
+from ._crc import crc16_modbus
 
 
 logger = getLogger(__name__)
-usleep = lambda x: time.sleep(x/1000000.0)  # noqa
+
+
+def usleep(usec):
+    """ 指定されたマイクロ秒だけ待機する関数です。
+
+    Args:
+        usec(int): 待機する時間。マイクロ秒で指定する。
+    """
+    time.sleep(usec / 1000000.0)
 
 
 class AM232x(object):
@@ -50,15 +60,27 @@ class AM232x(object):
     # I2C address of AM2321/AM2322.
     chip_addr = 0x5c
 
+    # CRC の計算に利用する関数。クラス属性として一度だけ束縛しておくことで、
+    # check_crc() がモジュールグローバルの探索なしで参照でき、
+    # サブクラスで別の実装に差し替えることもできる。
+    _crc16 = staticmethod(crc16_modbus)
+
     # define wait micro sec.
     wait_wakeup = 800
     wait_writemode = 1500
     wait_readmode = 30
     wait_refresh = 2000000
 
+    # 固定の待機時間は、毎回マイクロ秒から変換せずに済むよう、
+    # クラス定義時に一度だけ秒に変換しておく。
+    _sleep_wakeup = wait_wakeup / 1000000.0
+    _sleep_writemode = wait_writemode / 1000000.0
+    _sleep_readmode = wait_readmode / 1000000.0
+    _sleep_measure = max(wait_wakeup, wait_writemode) / 1000000.0
+
     def __init__(self, name="am232x", bus=1, wakeup=True, retry_wait=20000, retry_num=10):
         self._name = name
-        self._i2c = smbus.SMBus(bus)
+        self._i2c = SMBus(bus)
         self._bus = bus
         self._retry_wait = retry_wait
         self._retry_num = retry_num
@@ -66,6 +88,11 @@ class AM232x(object):
         self._write_mode = False
         self._measured = False
         self._read_time = 0
+        self._raw_data = None
+        self._raw_bytes = None
+        self._humidity = None
+        self._temperature = None
+        self._discomfort = None
         if wakeup:
             self.wakeup()
 
@@ -74,10 +101,13 @@ class AM232x(object):
 
         このセンサーは頻繁に I2C 通信に失敗し IOError が送出されるので、 I2C 通信をリトライさせます。
 
+        リトライ時の待機時間は 50 マイクロ秒から始まる指数バックオフで、 retry_wait を上限とします。
+        失敗が一時的なものであればすぐに復帰でき、継続する場合でも従来と同じ retry_wait まで待機時間が伸びます。
+
         Args:
             func(func): I2C 通信を行う関数。
             args(tuple): func に渡す引数一式。
-            retry_wait(int): リトライ時の待機時間。マイクロ秒で指定する。指定がない場合は、インスタンス初期化時の retry_wait が利用される。
+            retry_wait(int): リトライ時の待機時間の上限。マイクロ秒で指定する。指定がない場合は、インスタンス初期化時の retry_wait が利用される。
             retry_num(int): 最大リトライ回数。指定がない場合は、インスタンス初期化時の retry_cnt が利用される。
 
         Raises:
@@ -94,7 +124,8 @@ class AM232x(object):
                 return func(chip_addr, *args)
             except IOError as e:
                 if cnt < retry_num:
-                    usleep(retry_wait)
+                    # 指数バックオフ。 50 マイクロ秒から倍々で伸ばし、 retry_wait を上限とする。
+                    usleep(min(retry_wait, 50 << cnt))
                     cnt += 1
                     logger.debug(("{name} : Execute the \"{func}\" was failed. "
                                   "retry count: {cnt}/{limit}: Exception: {exception}"
@@ -124,54 +155,102 @@ class AM232x(object):
         args = (register, data_list)
         self._func_i2c_retry(func=i2c.write_i2c_block_data, args=args)
 
-    def _read_i2c_block_data(self, register, length):
+    def _i2c_read(self, chip_addr, length):
+        """ i2c_rdwr を利用して AM2321/AM2322 から length バイトを読み出すメソッドです。
+
+        バイト毎の int のリストを組み立てる read_i2c_block_data と異なり、
+        カーネルから受け取ったバッファをそのまま bytes として戻します。
+
+        Args:
+            chip_addr(int): 読み込みを行うチップの I2C アドレス。
+            length(int): 読み込むデータの長さ(バイト数)。
+
+        Returns:
+            bytes: 読み込んだデータ。
+        """
+        msg = i2c_msg.read(chip_addr, length)
+        self._i2c.i2c_rdwr(msg)
+        return bytes(bytearray(msg))
+
+    def _read_data(self, length):
         """ AM2321/AM2322 からデータを読み出すメソッドです。
 
         Args:
-            register(int): 読み込みを行うアドレス。
             length(int): 読み込むデータの長さ(バイト数)。
 
         Returns:
-            list: 読み込んだデータ(バイト毎)のリスト。
+            bytes: 読み込んだデータ。
         """
-        i2c = self._i2c
-        args = (register, length)
-        return self._func_i2c_retry(func=i2c.read_i2c_block_data, args=args, retry_wait=200000)
+        return self._func_i2c_retry(func=self._i2c_read, args=(length,), retry_wait=200000)
 
-    def wakeup(self):
-        """ スリープ状態にある AM2321/AM2322 を動作させるシグナルを送出するメソッドです。"""
-        if self._wakeup:
-            return
+    def _send_wakeup(self):
+        """ AM2321/AM2322 を動作させるシグナルを送出する(待機は行わない)メソッドです。
+
+        待機時間は呼び出し元が制御します。通常は wakeup() を利用してください。
+        """
         i2c = self._i2c
         chip_addr = self.chip_addr
-        cur_time = time.time()
 
         try:
             i2c.write_byte_data(chip_addr, 0x00, 0x00)
         except Exception:
             pass  # wakeup は必ず通信が失敗する。これは AM2321/2322 の仕様。
         self._wakeup = True
-        usleep(self.wait_wakeup)
+
+    def wakeup(self):
+        """ スリープ状態にある AM2321/AM2322 を動作させるシグナルを送出するメソッドです。"""
+        if self._wakeup:
+            return
+        self._send_wakeup()
+        time.sleep(self._sleep_wakeup)
 
     def set_write_mode(self):
         """ AM2321/AM2322 を書き込みモードにするメソッドです。"""
         self._write_byte_data(0x00, 0x00)
         self._write_mode = True
-        usleep(self.wait_writemode)
+        time.sleep(self._sleep_writemode)
 
     def measure(self):
         """ AM2321/AM2322 に、データを計測する命令を送信するメソッドです。 """
-        self.wakeup()
-        if not self._write_mode:
+        if not self._wakeup:
+            # wakeup で書き込む 0x00 は set_write_mode() の書き込みと同一で、
+            # 書き込みモードのアドレスポインタもこの時点で設定される。
+            # このため 2 回目の書き込みを省略し、 2 つの待機を長い方の 1 回にまとめる。
+            self._send_wakeup()
+            self._write_mode = True
+            time.sleep(self._sleep_measure)
+        elif not self._write_mode:
             self.set_write_mode()
         self._write_i2c_block_data(0x03, [0x00, 0x04])
         self._measured = True
-        usleep(self.wait_readmode)
-        if hasattr(self, "_raw_data"):
-            # "_raw_data" を削除し、 self._calc() 実行時に再度 self.read() が実行されるようにする。
-            delattr(self, "_raw_data")
+        time.sleep(self._sleep_readmode)
+        # "_raw_data" を破棄し、 self._calc() 実行時に再度 self.read() が実行されるようにする。
+        self._raw_data = None
+        self._raw_bytes = None
         self._del_properties()
 
+    def _validate(self, check_err=True, check_crc=True):
+        """ AM2321/AM2322 から受信したデータのエラーコードと CRC を、バッファの 1 回の参照でまとめて検証するメソッドです。
+
+        Args:
+            check_err(bool): エラーコードの検証を行うか否か。デフォルトは True.
+            check_crc(bool): CRC の検証を行うか否か。デフォルトは True.
+
+        Raises:
+            ReceiveAM232xDataError: 受信したデータにエラーコードが含まれていた場合に送出される Exception.
+            AM232xCrcCheckError: 受信した CRC と、受信したデータを計算して得られた CRC に相違があった場合に送出される Exception.
+        """
+        buf = self._raw_bytes
+        if check_err:
+            code = buf[2]
+            if code >= 0x80:
+                raise ReceiveAM232xDataError(error_code=code, chip_name=self._name)
+        if check_crc:
+            rcv_crcsum = buf[7] << 8 | buf[6]
+            clc_crcsum = self._crc16(buf[:6])
+            if rcv_crcsum != clc_crcsum:
+                raise AM232xCrcCheckError(recv_crc=rcv_crcsum, calc_crc=clc_crcsum, chip_name=self._name)
+
     def check_err(self):
         """ AM2321/AM2322 から受信したデータに、エラーコードが含まれていたら例外を送出するメソッドです。
 
@@ -182,10 +261,7 @@ class AM232x(object):
         Raises:
             ReceiveAM232xDataError: 受信したデータにエラーコードが含まれていた場合に送出される Exception.
         """
-        raw = self._raw_data
-        code = raw[2]
-        if code >= 0x80:
-            raise ReceiveAM232xDataError(error_code=code, chip_name=self._name)
+        self._validate(check_err=True, check_crc=False)
 
     def check_crc(self):
         """ AM2321/AM2322 から受信した CRC と、受信したデータを計算して得られた CRC に相違があった場合に例外を送出するメソッドです。
@@ -197,21 +273,7 @@ class AM232x(object):
         Raises:
             AM232xCrcCheckError: 受信した CRC と、受信したデータを計算して得られた CRC に相違があった場合に送出される Exception.
         """
-        raw = self._raw_data
-        rcv_crcsum = raw[7] << 8 | raw[6]
-        clc_crcsum = 0xffff
-
-        for i in range(6):
-            clc_crcsum ^= raw[i]
-            for j in range(8):
-                if (clc_crcsum & 1):
-                    clc_crcsum = clc_crcsum >> 1
-                    clc_crcsum ^= 0xa001
-                else:
-                    clc_crcsum = clc_crcsum >> 1
-
-        if rcv_crcsum != clc_crcsum:
-            raise AM232xCrcCheckError(recv_crc=rcv_crcsum, calc_crc=clc_crcsum, chip_name=self._name)
+        self._validate(check_err=False, check_crc=True)
 
     def read(self, check_err=True, check_crc=True, retry_num=10, retry_wait=2000000):
         """ AM2321/AM2322 から計測したデータを読み出すメソッドです。
@@ -230,17 +292,17 @@ class AM232x(object):
         while True:
             if not self._measured:
                 self.measure()
-            if not hasattr(self, "_raw_data"):
-                self._raw_data = self._read_i2c_block_data(0x00, 8)
+            if self._raw_data is None:
+                self._raw_data = self._read_data(8)
+                self._raw_bytes = self._raw_data
                 self._del_properties()
                 self._wakeup = False
                 self._write_mode = False
-                self._read_time = time.time()
+                # 鮮度の判定 (wait_refresh との比較) 用なので、 NTP で巻き戻り得る
+                # time.time() ではなく単調増加の time.monotonic_ns() を記録する。
+                self._read_time = time.monotonic_ns()
                 try:
-                    if check_err:
-                        self.check_err()
-                    if check_crc:
-                        self.check_crc()
+                    self._validate(check_err=check_err, check_crc=check_crc)
                 except AM232xError as e:
                     if cnt < retry_num:
                         if isinstance(e, ReceiveAM232xDataError):
@@ -256,20 +318,18 @@ class AM232x(object):
 
             return self._raw_data
 
-    def _calc(self, high_idx, low_idx):
+    def _calc(self, offset):
         """ AM2321/AM2322 から受信したデータを計算し、必要な情報を取得する為のメソッドです。
 
         Args:
-            high_idx(int): 上位バイトとして利用するデータのインデックス番号。
-            low_idx(int): 下位バイトとして利用するデータのインデックス番号。
+            offset(int): 上位バイトとして利用するデータのインデックス番号。この位置からビッグエンディアンの 2 バイトを読み取る。
 
         Returns:
             float: 計算結果を戻します。
         """
-        if not hasattr(self, "_raw_data"):
+        if self._raw_data is None:
             self.read()
-        raw = self._raw_data
-        return (raw[high_idx] << 8 | raw[low_idx]) / 10.0
+        return struct.unpack_from(">H", self._raw_bytes, offset)[0] / 10.0
 
     def _del_properties(self):
         """ キャッシュした気温、湿度、不快指数を削除するメソッドです。
@@ -279,28 +339,32 @@ class AM232x(object):
         """
         properties = ["_humidity", "_temperature", "_discomfort"]
         for p in properties:
-            if hasattr(self, p):
-                delattr(self, p)
+            setattr(self, p, None)
 
     @property
     def humidity(self):
         """ 湿度を取得します。単位は%です。 """
-        if not hasattr(self, "_humidity"):
-            self._humidity = self._calc(2, 3)
+        if self._humidity is None:
+            self._humidity = self._calc(2)
         return self._humidity
 
     @property
     def temperature(self):
         """ 気温を取得します。単位は℃です。 """
-        if not hasattr(self, "_temperature"):
-            self._temperature = self._calc(4, 5)
+        if self._temperature is None:
+            self._temperature = self._calc(4)
         return self._temperature
 
     @property
     def discomfort(self):
-        """ 不快指数を取得します。指数なので単位はありません。 """
-        if not hasattr(self, "_discomfort"):
+        """ 不快指数を取得します。指数なので単位はありません。
+
+        計算結果はキャッシュされ、 measure() による再計測まで再計算されません。
+        """
+        if self._discomfort is None:
             hum = self.humidity
             temp = self.temperature
-            self._discomfort = 0.81 * temp + 0.01 * hum * (0.99 * temp - 14.3) + 46.3
+            # 0.81 * temp + 0.01 * hum * (0.99 * temp - 14.3) + 46.3 を展開し、
+            # 定数を畳み込んだ形。乗算 1 回分少なく計算できる。
+            self._discomfort = temp * (0.81 + 0.0099 * hum) - 0.143 * hum + 46.3
         return self._discomfort